@@ -2,9 +2,12 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from sklearn.linear_model import LinearRegression
+from sklearn.linear_model import LinearRegression, Ridge, Lasso, LassoCV, HuberRegressor
+from sklearn.model_selection import GridSearchCV, KFold
 from sklearn.metrics import r2_score, mean_squared_error
 import argparse
+import hashlib
+import re
 import sys
 from pathlib import Path
 import warnings
@@ -27,9 +30,24 @@ class SinavKarneAnaliz:
         "DİN": ("DDS", "DIN", "#DDA0DD", "")
     }
     
-    def __init__(self, sinav_dosya=None, karne_dosya=None):
+    REGRESYON_YONTEMLERI = ("ols", "ridge", "lasso", "huber")
+    # Alpha adaylari en buyuk tekil deger karesine (s[0]**2) gore olceklenir
+    RIDGE_ALPHA_ORANLARI = np.logspace(-8, 2, 60)
+    HUBER_ALPHA_ORANLARI = np.logspace(-8, 2, 21)
+    
+    def __init__(self, sinav_dosya=None, karne_dosya=None, regresyon_yontemi="ols", alpha=None):
+        if regresyon_yontemi not in self.REGRESYON_YONTEMLERI:
+            raise ValueError(
+                f"Gecersiz regresyon yontemi: {regresyon_yontemi} "
+                f"(secenekler: {', '.join(self.REGRESYON_YONTEMLERI)})"
+            )
+        if alpha is not None and not (np.isfinite(alpha) and alpha >= 0):
+            raise ValueError(f"Alpha sonlu ve negatif olmayan bir sayi olmali: {alpha}")
+        
         self.sinav_dosya = sinav_dosya
         self.karne_dosya = karne_dosya
+        self.regresyon_yontemi = regresyon_yontemi
+        self.alpha = alpha
         self.sinav_data = None
         self.karne_data = None
         self.veri = None
@@ -107,9 +125,77 @@ class SinavKarneAnaliz:
             "intercept": model.intercept_
         }
     
-    def coklu_regresyon(self, X, y):
-        model = LinearRegression()
-        model.fit(X, y)
+    @staticmethod
+    def svd_hazirla(X):
+        # Ayni X tum dersler icin ortak; SVD kohort basina bir kez hesaplanir
+        X_merkez = X - X.mean(axis=0)
+        U, s, _ = np.linalg.svd(X_merkez, full_matrices=False)
+        return {"U": U, "s": s, "n": X.shape[0]}
+    
+    @staticmethod
+    def alpha_izgarasi(svd, oranlar):
+        return max(svd["s"][0] ** 2, 1e-12) * oranlar
+    
+    def ridge_alpha_sec(self, svd, y):
+        # Kapali form leave-one-out: e_i / (1 - h_ii), her aday alpha icin yeniden fit yok
+        U, s, n = svd["U"], svd["s"], svd["n"]
+        alphalar = self.alpha_izgarasi(svd, self.RIDGE_ALPHA_ORANLARI)
+        
+        y_merkez = y - y.mean()
+        Uty = U.T @ y_merkez
+        d = s ** 2 / (s[None, :] ** 2 + alphalar[:, None])
+        
+        y_tahmin = U @ (d * Uty).T
+        h = 1.0 / n + (U ** 2) @ d.T
+        loo_hata = (y_merkez[:, None] - y_tahmin) / (1 - h)
+        loo_mse = np.mean(loo_hata ** 2, axis=0)
+        
+        en_iyi = np.argmin(loo_mse)
+        return alphalar[en_iyi], en_iyi == len(alphalar) - 1
+    
+    def regresyon_modeli_olustur(self, X, y, svd=None):
+        # (model, alpha, alpha_sinirda) dondurur; alpha_sinirda, otomatik secilen
+        # alpha en buyuk adaysa True olur (gercek optimum disarida olabilir). En kucuk
+        # aday zaten OLS'ye denk oldugundan alt uc uyari sebebi degildir.
+        yontem = self.regresyon_yontemi
+        alpha = self.alpha
+        
+        if yontem == "ols":
+            return LinearRegression().fit(X, y), None, False
+        
+        if alpha is not None:
+            if yontem == "ridge":
+                return Ridge(alpha=alpha).fit(X, y), alpha, False
+            if yontem == "lasso":
+                return Lasso(alpha=alpha, max_iter=10000).fit(X, y), alpha, False
+            return HuberRegressor(alpha=alpha, max_iter=1000).fit(X, y), alpha, False
+        
+        if svd is None and yontem in ("ridge", "huber"):
+            svd = self.svd_hazirla(X)
+        
+        if yontem == "ridge":
+            alpha, sinirda = self.ridge_alpha_sec(svd, y)
+            return Ridge(alpha=alpha).fit(X, y), alpha, sinirda
+        
+        cv = KFold(n_splits=min(5, len(y)), shuffle=True, random_state=42)
+        
+        if yontem == "lasso":
+            model = LassoCV(cv=cv, max_iter=10000).fit(X, y)
+            sinirda = model.alpha_ == model.alphas_.max()
+            return model, model.alpha_, sinirda
+        
+        alphalar = self.alpha_izgarasi(svd, self.HUBER_ALPHA_ORANLARI)
+        arama = GridSearchCV(
+            HuberRegressor(max_iter=1000),
+            {"alpha": alphalar},
+            cv=cv,
+            scoring="neg_mean_squared_error"
+        ).fit(X, y)
+        alpha = arama.best_params_["alpha"]
+        return arama.best_estimator_, alpha, alpha == alphalar[-1]
+    
+    def coklu_regresyon(self, X, y, svd=None):
+        model, alpha, alpha_sinirda = self.regresyon_modeli_olustur(X, y, svd)
         y_pred = model.predict(X)
         
         return {
@@ -118,7 +204,10 @@ class SinavKarneAnaliz:
             "r2": r2_score(y, y_pred),
             "rmse": np.sqrt(mean_squared_error(y, y_pred)),
             "katsayilar": model.coef_,
-            "intercept": model.intercept_
+            "intercept": model.intercept_,
+            "yontem": self.regresyon_yontemi,
+            "alpha": alpha,
+            "alpha_sinirda": alpha_sinirda
         }
     
     def korelasyon_matrisi_hesapla(self):
@@ -218,13 +307,22 @@ class SinavKarneAnaliz:
         
         X_coklu = self.veri[[f"{d}_T_SINAV" for d in self.DERSLER]].values
         
+        svd = None
+        if self.regresyon_yontemi in ("ridge", "huber") and self.alpha is None:
+            svd = self.svd_hazirla(X_coklu)
+        
+        print(f"  Coklu regresyon yontemi: {self.regresyon_yontemi.upper()}\n")
+        
         for ders in self.DERSLER:
             y = self.veri[f"{ders}_T_KARNE"].values
-            coklu = self.coklu_regresyon(X_coklu, y)
+            coklu = self.coklu_regresyon(X_coklu, y, svd)
             self.sonuclar[ders]["coklu"] = coklu
             
             iyilesme = (coklu['r2'] - self.sonuclar[ders]['basit']['r2']) * 100
-            print(f"  {ders:12} - Coklu R2: {coklu['r2']:.4f}, RMSE: {coklu['rmse']:.3f} (+{iyilesme:.1f}%)")
+            alpha_yazi = f", alpha: {coklu['alpha']:.4g}" if coklu['alpha'] is not None else ""
+            if coklu['alpha_sinirda']:
+                alpha_yazi += " (izgara ust sinirinda)"
+            print(f"  {ders:12} - Coklu R2: {coklu['r2']:.4f}, RMSE: {coklu['rmse']:.3f} (+{iyilesme:.1f}%){alpha_yazi}")
         
         print("\nTum analizler tamamlandi!")
     
@@ -335,16 +433,23 @@ class SinavKarneAnaliz:
                 'R2': f"{coklu['r2']:.4f}",
                 'RMSE': f"{coklu['rmse']:.3f}",
                 'R2 Artisi': f"{coklu['r2'] - basit['r2']:.4f}",
-                'Iyilesme %': f"{(coklu['r2'] - basit['r2']) * 100:.1f}%"
+                'Iyilesme %': f"{(coklu['r2'] - basit['r2']) * 100:.1f}%",
+                'Alpha': f"{coklu['alpha']:.4g}" if coklu['alpha'] is not None else "-"
             })
         
         coklu_df = pd.DataFrame(coklu_data)
         print(coklu_df.to_string(index=False))
         
+        sinirda = [d for d in self.DERSLER if self.sonuclar[d]['coklu']['alpha_sinirda']]
+        if sinirda:
+            print(f"\nUyari: {', '.join(sinirda)} icin secilen alpha aday izgarasinin ust ucunda; "
+                  "gercek optimum izgara disinda olabilir.")
+        
         print("\n\nOZET ISTATISTIKLER")
         print("-" * 90)
         print(f"Toplam Ogrenci Sayisi:    {len(self.veri)}")
         print(f"Analiz Edilen Ders:       {len(self.DERSLER)}")
+        print(f"Coklu Regresyon Yontemi:  {self.regresyon_yontemi.upper()}")
         
         avg_r2_basit = np.mean([self.sonuclar[d]['basit']['r2'] for d in self.DERSLER])
         avg_r2_coklu = np.mean([self.sonuclar[d]['coklu']['r2'] for d in self.DERSLER])
@@ -407,6 +512,239 @@ class SinavKarneAnaliz:
         return True
 
 
+class BoylamsalAnaliz:
+    
+    INDEKS_DOSYA = "donemler.csv"
+    INDEKS_SUTUNLARI = ["donem", "dosya", "imza", "yontem", "ogrenci_sayisi"]
+    
+    def __init__(self, gecmis_dizin="gecmis", regresyon_yontemi="ols", alpha=None):
+        self.gecmis_dizin = Path(gecmis_dizin)
+        self.gecmis_dizin.mkdir(exist_ok=True, parents=True)
+        self.regresyon_yontemi = regresyon_yontemi
+        self.alpha = alpha
+        self.dersler = list(SinavKarneAnaliz.DERSLER)
+        self.indeks = self._indeks_yukle()
+        self._bellek = {}
+    
+    def _indeks_yukle(self):
+        dosya = self.gecmis_dizin / self.INDEKS_DOSYA
+        if dosya.exists():
+            indeks = pd.read_csv(dosya, dtype={"donem": str, "dosya": str, "imza": str})
+            return self._indeks_sirala(indeks)
+        return pd.DataFrame(columns=self.INDEKS_SUTUNLARI)
+    
+    @staticmethod
+    def donem_sira_anahtari(donem):
+        # Dogal siralama: rakam gruplari sayi olarak karsilastirilir (2024-9 < 2024-10)
+        return re.sub(r"\d+", lambda m: m.group().zfill(12), str(donem))
+    
+    @classmethod
+    def _indeks_sirala(cls, indeks):
+        # Trend ve kayma hesaplari donem adlarinin siralamasini zaman sirasi kabul eder
+        return indeks.sort_values(
+            "donem", key=lambda donemler: donemler.map(cls.donem_sira_anahtari), kind="stable"
+        ).reset_index(drop=True)
+    
+    def donemler(self):
+        return self.indeks["donem"].tolist()
+    
+    @staticmethod
+    def imza_hesapla(sinav_dosya, karne_dosya, regresyon_yontemi, alpha):
+        imza = hashlib.md5()
+        for dosya in (sinav_dosya, karne_dosya):
+            imza.update(Path(dosya).read_bytes())
+        imza.update(f"{regresyon_yontemi}:{alpha}".encode())
+        return imza.hexdigest()
+    
+    def donem_imzasi(self, sinav_dosya, karne_dosya):
+        try:
+            return self.imza_hesapla(sinav_dosya, karne_dosya, self.regresyon_yontemi, self.alpha)
+        except OSError as e:
+            print(f"Hata: Dosya bulunamadi - {e}")
+            return None
+    
+    def donem_guncel_mi(self, donem, imza):
+        kayit = self.indeks[self.indeks["donem"] == str(donem)]
+        return bool(len(kayit)) and kayit["imza"].iloc[0] == imza
+    
+    def donem_kaydet(self, donem, analiz, imza=None):
+        donem = str(donem)
+        if imza is None:
+            imza = self.imza_hesapla(analiz.sinav_dosya, analiz.karne_dosya,
+                                     analiz.regresyon_yontemi, analiz.alpha)
+        if "GELISIM_FARKI" not in analiz.veri:
+            analiz.performans_indeksi_hesapla()
+        
+        veri = analiz.veri
+        sonuc = analiz.sonuclar
+        dosya = f"donem_{hashlib.md5(donem.encode()).hexdigest()[:12]}.npz"
+        
+        np.savez_compressed(
+            self.gecmis_dizin / dosya,
+            rumuz=veri["RUMUZ"].to_numpy(dtype=str),
+            sinav_t=veri[[f"{d}_T_SINAV" for d in self.dersler]].values.astype(np.float32),
+            karne_t=veri[[f"{d}_T_KARNE" for d in self.dersler]].values.astype(np.float32),
+            gelisim=veri["GELISIM_FARKI"].values.astype(np.float32),
+            basit_r2=np.array([sonuc[d]["basit"]["r2"] for d in self.dersler]),
+            basit_egim=np.array([sonuc[d]["basit"]["slope"] for d in self.dersler]),
+            coklu_r2=np.array([sonuc[d]["coklu"]["r2"] for d in self.dersler]),
+            coklu_rmse=np.array([sonuc[d]["coklu"]["rmse"] for d in self.dersler]),
+            katsayilar=np.vstack([sonuc[d]["coklu"]["katsayilar"] for d in self.dersler]),
+            kesim=np.array([sonuc[d]["coklu"]["intercept"] for d in self.dersler]),
+            alpha=np.array([np.nan if sonuc[d]["coklu"]["alpha"] is None
+                            else sonuc[d]["coklu"]["alpha"] for d in self.dersler])
+        )
+        
+        satir = {
+            "donem": donem,
+            "dosya": dosya,
+            "imza": imza,
+            "yontem": analiz.regresyon_yontemi,
+            "ogrenci_sayisi": len(veri)
+        }
+        if donem in self.donemler():
+            self.indeks.loc[self.indeks["donem"] == donem, list(satir)] = list(satir.values())
+        else:
+            self.indeks = pd.concat([self.indeks, pd.DataFrame([satir])], ignore_index=True)
+        self.indeks = self._indeks_sirala(self.indeks)
+        self.indeks.to_csv(self.gecmis_dizin / self.INDEKS_DOSYA, index=False)
+        self._bellek.pop(donem, None)
+        
+        print(f"Donem {donem} gecmise kaydedildi: {len(veri)} ogrenci")
+    
+    def donem_yukle(self, donem):
+        if donem not in self._bellek:
+            dosya = self.indeks.loc[self.indeks["donem"] == donem, "dosya"].iloc[0]
+            with np.load(self.gecmis_dizin / dosya) as npz:
+                self._bellek[donem] = {k: npz[k] for k in npz.files}
+        return self._bellek[donem]
+    
+    def gelisim_trendi(self, sadece_ortak=False):
+        donemler = self.donemler()
+        
+        parcalar = []
+        for donem in donemler:
+            d = self.donem_yukle(donem)
+            parcalar.append(pd.DataFrame({
+                "RUMUZ": d["rumuz"],
+                "DONEM": donem,
+                "GELISIM_FARKI": d["gelisim"].astype(float)
+            }))
+        uzun = pd.concat(parcalar, ignore_index=True)
+        
+        tablo = uzun.pivot_table(
+            index="RUMUZ", columns="DONEM", values="GELISIM_FARKI", aggfunc="mean"
+        ).reindex(columns=donemler)
+        if sadece_ortak:
+            tablo = tablo.dropna()
+        
+        Y = tablo.values
+        maske = ~np.isnan(Y)
+        sayi = maske.sum(axis=1)
+        x = np.arange(len(donemler), dtype=float)
+        satir = np.arange(len(Y))
+        
+        with np.errstate(invalid="ignore", divide="ignore"):
+            x_ort = (maske * x).sum(axis=1) / sayi
+            y_ort = np.nansum(Y, axis=1) / sayi
+            dx = np.where(maske, x - x_ort[:, None], 0.0)
+            dy = np.where(maske, Y - y_ort[:, None], 0.0)
+            egim = (dx * dy).sum(axis=1) / (dx ** 2).sum(axis=1)
+        egim[sayi < 2] = np.nan
+        
+        ilk = Y[satir, maske.argmax(axis=1)]
+        son = Y[satir, len(donemler) - 1 - maske[:, ::-1].argmax(axis=1)]
+        
+        tablo["DONEM_SAYISI"] = sayi
+        tablo["TOPLAM_DEGISIM"] = np.where(sayi >= 2, son - ilk, np.nan)
+        tablo["TREND"] = egim
+        tablo.columns.name = None
+        
+        return tablo.reset_index()
+    
+    def regresyon_kaymasi(self):
+        tablolar = []
+        onceki = None
+        onceki_yontem = None
+        
+        for donem, yontem in zip(self.indeks["donem"], self.indeks["yontem"]):
+            d = self.donem_yukle(donem)
+            
+            tablo = pd.DataFrame({
+                "Donem": donem,
+                "Ders": self.dersler,
+                "Yontem": yontem,
+                "Basit_R2": d["basit_r2"],
+                "Basit_Egim": d["basit_egim"],
+                "Coklu_R2": d["coklu_r2"],
+                "Coklu_RMSE": d["coklu_rmse"],
+                "Alpha": d["alpha"]
+            })
+            for j, ders in enumerate(self.dersler):
+                tablo[f"K_{ders}"] = d["katsayilar"][:, j]
+            
+            # Farkli yontemlerin katsayilari karsilastirilamaz; kayma yalnizca ayni yontemde
+            if onceki is None or yontem != onceki_yontem:
+                tablo["R2_Kaymasi"] = np.nan
+                tablo["Katsayi_Kaymasi"] = np.nan
+            else:
+                tablo["R2_Kaymasi"] = d["coklu_r2"] - onceki["coklu_r2"]
+                tablo["Katsayi_Kaymasi"] = np.linalg.norm(
+                    d["katsayilar"] - onceki["katsayilar"], axis=1
+                )
+            
+            tablolar.append(tablo)
+            onceki = d
+            onceki_yontem = yontem
+        
+        return pd.concat(tablolar, ignore_index=True)
+    
+    def trend_raporu_olustur(self, output_dir="output", sadece_ortak=False):
+        if not self.donemler():
+            print(f"Hata: Gecmiste kayitli donem yok ({self.gecmis_dizin})")
+            return None
+        
+        print(f"\nDonemler arasi rapor olusturuluyor ({output_dir}/)...")
+        Path(output_dir).mkdir(exist_ok=True, parents=True)
+        
+        trend = self.gelisim_trendi(sadece_ortak)
+        kayma = self.regresyon_kaymasi()
+        
+        print("\n" + "=" * 90)
+        print(" " * 25 + "DONEMLER ARASI GELISIM RAPORU")
+        print("=" * 90 + "\n")
+        print(f"Donemler:                 {', '.join(self.donemler())}")
+        print(f"Takip Edilen Ogrenci:     {len(trend)}")
+        print(f"Tum Donemlerde Olan:      {int((trend['DONEM_SAYISI'] == len(self.donemler())).sum())}")
+        
+        print("\n\nGELISIM_FARKI TRENDI")
+        print("-" * 90)
+        print(trend.round(3).to_string(index=False))
+        
+        print("\n\nREGRESYON KAYMASI")
+        print("-" * 90)
+        print(kayma[["Donem", "Ders", "Yontem", "Basit_R2", "Coklu_R2", "R2_Kaymasi", "Katsayi_Kaymasi"]]
+              .round(4).to_string(index=False))
+        
+        yontemler = self.indeks["yontem"].tolist()
+        degisen = [d for i, d in enumerate(self.donemler()[1:], 1) if yontemler[i] != yontemler[i - 1]]
+        if degisen:
+            print(f"\nUyari: {', '.join(degisen)} doneminde regresyon yontemi degisti; "
+                  "bu donemler icin kayma hesaplanmadi.")
+        
+        print("\n" + "=" * 90 + "\n")
+        
+        trend_dosya = Path(output_dir) / "gelisim_trendi.csv"
+        trend.to_csv(trend_dosya, index=False, float_format="%.4f")
+        print(f"Trend tablosu kaydedildi: {trend_dosya}")
+        
+        kayma_dosya = Path(output_dir) / "regresyon_kaymasi.csv"
+        kayma.to_csv(kayma_dosya, index=False)
+        print(f"Regresyon kaymasi kaydedildi: {kayma_dosya}")
+        
+        return {"trend": trend, "kayma": kayma}
+
+
 def demo_veri_olustur():
     print("Demo veriler olusturuluyor...")
     
@@ -449,6 +787,10 @@ Ornekler:
   python analiz.py --sinav sinav.csv --karne karne.csv --output results/
   python analiz.py --demo
   python analiz.py --demo --no-plot
+  python analiz.py --demo --yontem ridge
+  python analiz.py --demo --yontem huber --alpha 0.01
+  python analiz.py --sinav sinav.csv --karne karne.csv --donem 2024-1
+  python analiz.py --trend --gecmis gecmis/ --output trend/
         """
     )
     
@@ -460,9 +802,25 @@ Ornekler:
                        help='Demo verilerle calistir')
     parser.add_argument('--no-plot', action='store_true', 
                        help='Grafikleri gosterme')
+    parser.add_argument('--yontem', type=str, default='ols',
+                       choices=SinavKarneAnaliz.REGRESYON_YONTEMLERI,
+                       help='Coklu regresyon yontemi (varsayilan: ols)')
+    parser.add_argument('--alpha', type=float, default=None,
+                       help='Duzenlilestirme katsayisi (verilmezse otomatik secilir)')
+    parser.add_argument('--donem', type=str,
+                       help='Sonuclari bu donem adiyla gecmise kaydet (boylamsal mod)')
+    parser.add_argument('--gecmis', type=str, default='gecmis',
+                       help='Donem gecmisi klasoru (varsayilan: gecmis)')
+    parser.add_argument('--trend', action='store_true',
+                       help='Kayitli donemlerden trend ve regresyon kaymasi raporu olustur')
+    parser.add_argument('--ortak', action='store_true',
+                       help='Trendde yalnizca tum donemlerde bulunan ogrencileri goster')
     
     args = parser.parse_args()
     
+    if args.alpha is not None and not (np.isfinite(args.alpha) and args.alpha >= 0):
+        parser.error('--alpha sonlu ve negatif olmayan bir sayi olmali')
+    
     print("\n" + "="*90)
     print(" " * 20 + "SINAV-KARNE ANALIZ PLATFORMU")
     print("="*90 + "\n")
@@ -472,13 +830,36 @@ Ornekler:
     elif args.sinav and args.karne:
         sinav_dosya = args.sinav
         karne_dosya = args.karne
+    elif args.trend:
+        sinav_dosya = karne_dosya = None
     else:
         parser.print_help()
         sys.exit(1)
     
-    analiz = SinavKarneAnaliz(sinav_dosya, karne_dosya)
-    analiz.calistir(args.output, not args.no_plot)
-
+    if args.donem and sinav_dosya is None:
+        parser.error('--donem icin --sinav/--karne veya --demo gerekli')
+    
+    gecmis = None
+    if args.donem or args.trend:
+        gecmis = BoylamsalAnaliz(args.gecmis, args.yontem, args.alpha)
+    
+    if sinav_dosya is not None:
+        imza = None
+        if args.donem:
+            imza = gecmis.donem_imzasi(sinav_dosya, karne_dosya)
+            if imza is None:
+                sys.exit(1)
+        
+        if args.donem and gecmis.donem_guncel_mi(args.donem, imza):
+            print(f"Donem {args.donem} gecmiste guncel: yeniden hesaplanmadi, "
+                  f"donem grafik ve raporlari ({args.output}/) atlandi")
+        else:
+            analiz = SinavKarneAnaliz(sinav_dosya, karne_dosya, args.yontem, args.alpha)
+            if analiz.calistir(args.output, not args.no_plot) and args.donem:
+                gecmis.donem_kaydet(args.donem, analiz, imza)
+    
+    if args.trend:
+        gecmis.trend_raporu_olustur(args.output, args.ortak)
 
 if __name__ == "__main__":
     main()
@@ -1,4 +1,5 @@
 import os
+import json
 import shutil
 import uuid
 import zipfile
@@ -8,10 +9,11 @@ import matplotlib
 matplotlib.use('Agg')
 
 try:
-    from OZTPAS import SinavKarneAnaliz
+    from OZTPAS import SinavKarneAnaliz, BoylamsalAnaliz
 except ImportError:
     print("Hata: OZTPAS.py bulunamadi.")
     SinavKarneAnaliz = None
+    BoylamsalAnaliz = None
 
 app = Flask(__name__)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -20,6 +22,8 @@ app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
+TREND_DOSYALARI = ['gelisim_trendi.csv', 'regresyon_kaymasi.csv']
+
 class InitializedAnaliz(SinavKarneAnaliz):
     def grafik_olustur(self, output_dir="output"):
         import matplotlib.pyplot as plt
@@ -100,6 +104,9 @@ def get_user_dir():
         os.makedirs(user_path, exist_ok=True)
     return user_path
 
+def tablo_json(df):
+    return json.loads(df.to_json(orient='records', force_ascii=False))
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -117,13 +124,26 @@ def upload_files():
 
     user_path = get_user_dir()
     
+    # Onceki yuklemeden kalan trend raporlari bu yuklemenin ZIP'ine karismasin
+    for f in TREND_DOSYALARI:
+        eski = os.path.join(user_path, f)
+        if os.path.exists(eski):
+            os.remove(eski)
+    
     sinav_path = os.path.join(user_path, 'sinav.csv')
     karne_path = os.path.join(user_path, 'karne.csv')
     sinav_file.save(sinav_path)
     karne_file.save(karne_path)
     
+    yontem = request.form.get('yontem', 'ols')
+    alpha = request.form.get('alpha', '').strip()
+    try:
+        alpha = float(alpha.replace(',', '.')) if alpha else None
+        analiz = InitializedAnaliz(sinav_path, karne_path, yontem, alpha)
+    except ValueError as e:
+        return jsonify({'error': f'Gecersiz regresyon ayari: {str(e)}'}), 400
+    
     try:
-        analiz = InitializedAnaliz(sinav_path, karne_path)
         if not analiz.veri_yukle():
             return jsonify({'error': 'Veri yukleme basarisiz.'}), 500
         
@@ -144,6 +164,14 @@ def upload_files():
             "karne": korelasyon["karne"].to_dict()
         }
         
+        donem = request.form.get('donem', '').strip()
+        donemler = []
+        if donem:
+            gecmis = BoylamsalAnaliz(os.path.join(user_path, 'gecmis'), yontem, alpha)
+            gecmis.donem_kaydet(donem, analiz)
+            gecmis.trend_raporu_olustur(user_path)
+            donemler = gecmis.donemler()
+        
         return jsonify({
             'status': 'success',
             'image_url': f'/results/regresyon_analizi.png?t={uuid.uuid4()}',
@@ -152,12 +180,36 @@ def upload_files():
             'korelasyon': korelasyon_data,
             'aykiri_deger_sayisi': len(aykiri_degerler),
             'performans': performans,
-            'ogrenci_sayisi': len(analiz.veri)
+            'ogrenci_sayisi': len(analiz.veri),
+            'yontem': analiz.regresyon_yontemi,
+            'alphalar': {d: analiz.sonuclar[d]['coklu']['alpha'] for d in analiz.DERSLER},
+            'donemler': donemler
         })
         
     except Exception as e:
         return jsonify({'error': f'Analiz hatasi: {str(e)}'}), 500
 
+@app.route('/trend')
+def trend():
+    user_path = get_user_dir()
+    gecmis = BoylamsalAnaliz(os.path.join(user_path, 'gecmis'))
+    
+    if not gecmis.donemler():
+        return jsonify({'error': 'Kayitli donem yok'}), 404
+    
+    try:
+        rapor = gecmis.trend_raporu_olustur(user_path, request.args.get('ortak') == '1')
+        return jsonify({
+            'status': 'success',
+            'donemler': gecmis.donemler(),
+            'trend_url': f'/results/gelisim_trendi.csv?t={uuid.uuid4()}',
+            'kayma_url': f'/results/regresyon_kaymasi.csv?t={uuid.uuid4()}',
+            'trend': tablo_json(rapor['trend']),
+            'kayma': tablo_json(rapor['kayma'])
+        })
+    except Exception as e:
+        return jsonify({'error': f'Trend hatasi: {str(e)}'}), 500
+
 @app.route('/results/<filename>')
 def serve_result(filename):
     user_path = get_user_dir()
@@ -169,7 +221,7 @@ def download_zip():
     zip_path = os.path.join(user_path, 'sonuclar.zip')
     
     with zipfile.ZipFile(zip_path, 'w') as zf:
-        for f in ['regresyon_analizi.png', 'regresyon_karsilastirma.csv', 'detayli_sonuclar.csv']:
+        for f in ['regresyon_analizi.png', 'regresyon_karsilastirma.csv', 'detayli_sonuclar.csv'] + TREND_DOSYALARI:
             full_path = os.path.join(user_path, f)
             if os.path.exists(full_path):
                 zf.write(full_path, f)